@@ -1,30 +1,34 @@
-from pyplexityai import PerplexityClient
+import aiohttp
+import asyncio
 import json
-import time
 import logging
+import orjson
 import argparse
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
 import os
 import random
+import re
+from pathlib import Path
 from dotenv import load_dotenv
 
-def create_prompt(word: str) -> str:
-    """
-    Create a prompt for the Perplexity AI client to gather information about a word.
-    
-    Args:
-        word (str): The English word to gather information about.
-        
-    Returns:
-        str: The formatted prompt string.
-    """
-    PROMPT = """You must provide information for the English word "{word}" in STRICT JSON format.
+PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+PERPLEXITY_MODEL = "sonar"
+
+# Patterns used to classify API errors and unparseable responses
+RATE_LIMIT_PATTERN = re.compile(r"rate[_ ]?limit|too many requests|\b429\b|quota", re.IGNORECASE)
+REFUSAL_PATTERN = re.compile(r"\s*(?:I'm sorry|I cannot)")
+ERROR_PATTERN = re.compile(r"error", re.IGNORECASE)
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+SYSTEM_PROMPT = """You provide information about English words in STRICT JSON format.
 
 CRITICAL: Your response must be ONLY valid JSON. Do not include any explanatory text, markdown formatting, code blocks, or additional commentary before or after the JSON.
 
-Required JSON structure (copy this exact format):
-{{
-  "word": "{word}",
+Each word must be described with this JSON structure (copy this exact format):
+{
+  "word": "<word>",
   "definition": "string - clear definition of the word",
   "part_of_speech": "string - primary part of speech (noun, verb, adjective, etc.)",
   "synonyms": ["string1", "string2"] - array with at most 2 synonyms (use empty array [] if none),
@@ -32,18 +36,67 @@ Required JSON structure (copy this exact format):
   "phonetic_spelling": "string - simple phonetic respelling (e.g. 'uh-beys' for 'abase')",
   "first_known_usage": "string - century when first used (e.g. '14th century') or null if unknown",
   "example_sentence": "string - sentence demonstrating clear word usage and meaning"
-}}
+}
+
+When asked for a single word, respond with that object alone.
+
+When asked for a list of words, respond with one object wrapping them all:
+{
+  "results": {
+    "<word>": { ...the structure above... }
+  }
+}
 
 REQUIREMENTS:
+- For a list of words, "results" must contain one entry for every word listed, keyed by the word exactly as written
 - Example sentence MUST demonstrate the word's meaning clearly and unambiguously, in context
 - Phonetic spelling should be simple respelling format (like 'nooz-pey-per' for 'newspaper')
 - Use null for unknown fields, empty arrays [] for missing synonyms/antonyms
 - Response must be parseable by JSON.parse() - no syntax errors allowed
-- No text outside the JSON object
+- No text outside the JSON object"""
 
-Generate the JSON for "{word}" now:"""
+def create_prompt(word: str) -> str:
+    """
+    Create the user prompt asking for information about a single word.
+    
+    The instructions live in SYSTEM_PROMPT so every request shares the
+    same prefix; only this short message varies.
+    
+    Args:
+        word (str): The English word to gather information about.
+        
+    Returns:
+        str: The formatted prompt string.
+    """
+    # json.dumps quotes the word and escapes anything that could break the prompt
+    return f"Generate the JSON for {json.dumps(word)} now."
 
-    return PROMPT.format(word=word)
+def create_batch_prompt(words: list[str]) -> str:
+    """
+    Create the user prompt asking for information about several words at once.
+    
+    Args:
+        words (list[str]): The English words to gather information about.
+        
+    Returns:
+        str: The formatted prompt string.
+    """
+    return f"Generate the JSON for all {len(words)} of these words now: {json.dumps(words)}"
+
+def create_messages(prompt: str) -> list[dict]:
+    """
+    Wrap a user prompt in the chat messages sent to the API.
+    
+    Args:
+        prompt (str): The user prompt from create_prompt or create_batch_prompt.
+        
+    Returns:
+        list[dict]: The system and user messages.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
 
 def setup_logging(debug=False):
     """Setup logging configuration."""
@@ -61,53 +114,126 @@ def load_existing_data(json_file_path):
     """Load existing JSON data if file exists."""
     if os.path.exists(json_file_path):
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Ensure metadata structure is correct
-                if "metadata" not in data:
-                    data["metadata"] = {}
-                
-                # Add missing metadata fields if needed
-                metadata_fields = {
-                    "total_words": len(data.get("words", {})),
-                    "created_date": data.get("metadata", {}).get("created_date", datetime.now().isoformat()),
-                    "last_updated": datetime.now().isoformat(),
-                    "source": "Perplexity AI via lexophile word processor",
-                    "word_list_file": "word_list_main.txt",
-                    "longest_definition": None,
-                    "longest_example_sentence": None
-                }
-                
-                # Update any missing fields
-                for key, default_value in metadata_fields.items():
-                    if key not in data.get("metadata", {}):
-                        data["metadata"][key] = default_value
-                
-                logging.info(f"Loaded existing data with {len(data.get('words', {}))} words")
-                return data
-        except (json.JSONDecodeError, Exception) as e:
+            data = orjson.loads(Path(json_file_path).read_bytes())
+            
+            # Ensure metadata structure is correct
+            if "metadata" not in data:
+                data["metadata"] = {}
+            
+            # Add missing metadata fields if needed
+            now_iso = datetime.now().isoformat()
+            metadata_fields = {
+                "total_words": len(data.get("words", {})),
+                "created_date": data.get("metadata", {}).get("created_date", now_iso),
+                "last_updated": now_iso,
+                "source": "Perplexity AI via lexophile word processor",
+                "word_list_file": "word_list_main.txt",
+                "longest_definition": None,
+                "longest_definition_length": 0,
+                "longest_example_sentence": None,
+                "longest_example_sentence_length": 0
+            }
+            
+            # Files written before lengths were tracked need one full scan
+            needs_longest_scan = "longest_definition_length" not in data["metadata"]
+            
+            # Update any missing fields
+            for key, default_value in metadata_fields.items():
+                if key not in data.get("metadata", {}):
+                    data["metadata"][key] = default_value
+            
+            if needs_longest_scan:
+                recalculate_longest(data)
+            
+            # Older entries get their completeness flag once; it is saved with them
+            backfill_complete_flags(data)
+            
+            logging.info(f"Loaded existing data with {len(data.get('words', {}))} words")
+            return data
+        except (orjson.JSONDecodeError, Exception) as e:
             logging.error(f"Error loading existing JSON file: {e}")
             return None
     return None
 
+def is_valid_word(word):
+    """
+    Check whether a word list entry is worth an API request.
+    
+    Args:
+        word (str): The normalized word list entry
+        
+    Returns:
+        bool: True for plain ASCII alphabetic words of 2-39 letters
+    """
+    return bool(word) and word.isascii() and word.isalpha() and 1 < len(word) < 40
+
+def get_journal_path(json_file_path):
+    """Return the path of the JSON-Lines journal that sits next to the JSON file."""
+    return os.path.splitext(json_file_path)[0] + ".jsonl"
+
+def get_temp_path(json_file_path):
+    """Return the path used to stage a save before it replaces the JSON file."""
+    return json_file_path + ".tmp"
+
+def load_journal(data, journal_path):
+    """
+    Fold word entries from a journal left behind by an interrupted run into data.
+    
+    Args:
+        data (dict): The loaded or newly created data structure
+        journal_path (str): Path to the JSON-Lines journal
+        
+    Returns:
+        int: Number of journal entries applied
+    """
+    if not os.path.exists(journal_path):
+        return 0
+    
+    applied = 0
+    with open(journal_path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # A crash mid-write can leave a truncated final line
+                logging.warning(f"Ignoring unreadable line {line_number} in {journal_path}")
+                continue
+            for word, entry in record.items():
+                store_word_entry(data, word, entry)
+                applied += 1
+    
+    logging.info(f"Recovered {applied} word entries from journal {journal_path}")
+    return applied
+
+def append_to_journal(journal, word, entry):
+    """Append a single word entry to the open journal file and flush it."""
+    journal.write(orjson.dumps({word: entry}) + b"\n")
+    journal.flush()
+
 def create_metadata(word_count=0):
     """Create metadata for the JSON file."""
+    now_iso = datetime.now().isoformat()
     return {
         "metadata": {
             "total_words": word_count,
-            "created_date": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat(),
+            "created_date": now_iso,
+            "last_updated": now_iso,
             "source": "Perplexity AI via lexophile word processor",
             "word_list_file": "word_list_main.txt",
             "longest_definition": None,
-            "longest_example_sentence": None
+            "longest_definition_length": 0,
+            "longest_example_sentence": None,
+            "longest_example_sentence_length": 0
         },
         "words": {}
     }
 
 def create_empty_word_entry(word, error_reason=None):
-    """Create an empty word entry with null/empty values for failed processing."""
+    """
+    Create an empty word entry with null/empty values for failed processing.
+    
+    processed_date is left for record_results to stamp with the batch timestamp.
+    """
     return {
         "word": word,
         "definition": None,
@@ -119,12 +245,12 @@ def create_empty_word_entry(word, error_reason=None):
         "example_sentence": None,
         "processing_status": "failed",
         "error_reason": error_reason,
-        "processed_date": datetime.now().isoformat()
+        "processed_date": None
     }
 
-def has_complete_data(word_entry):
+def has_required_fields(word_entry):
     """
-    Check if a word entry has all required fields populated.
+    Check field by field whether a word entry has all required data populated.
     
     Args:
         word_entry (dict): The word entry to check
@@ -157,6 +283,48 @@ def has_complete_data(word_entry):
     
     return True
 
+def has_complete_data(word_entry):
+    """
+    Check if a word entry has all required fields populated.
+    
+    Entries saved by this script carry a "_complete" flag computed when they
+    were recorded; older entries without it fall back to the field check.
+    
+    Args:
+        word_entry (dict): The word entry to check
+        
+    Returns:
+        bool: True if all required fields are present and not empty/null
+    """
+    if not word_entry:
+        return False
+    
+    complete = word_entry.get("_complete")
+    if complete is not None:
+        return complete is True
+    
+    return has_required_fields(word_entry)
+
+def backfill_complete_flags(data):
+    """
+    Add the "_complete" flag to entries saved before it existed.
+    
+    Args:
+        data (dict): The data structure holding the words
+        
+    Returns:
+        int: Number of entries that were given a flag
+    """
+    backfilled = 0
+    for entry in data["words"].values():
+        if entry and "_complete" not in entry:
+            entry["_complete"] = has_required_fields(entry)
+            backfilled += 1
+    
+    if backfilled:
+        logging.info(f"Added completeness flags to {backfilled} existing word entries")
+    return backfilled
+
 def needs_reprocessing(word_entry):
     """
     Determine if a word entry needs to be reprocessed due to missing data.
@@ -169,58 +337,146 @@ def needs_reprocessing(word_entry):
     """
     return not has_complete_data(word_entry)
 
+def update_longest(data, word, entry):
+    """
+    Update the longest definition/example sentence metadata with a new entry.
+    
+    This is a constant-time comparison against the lengths already stored in
+    the metadata, so it only covers entries that can raise the maximums; use
+    store_word_entry when an entry may be replaced.
+    
+    Args:
+        data (dict): The data structure holding the metadata
+        word (str): The word the entry belongs to
+        entry (dict): The word entry that was just added
+    """
+    # Skip entries with failed processing
+    if entry.get("processing_status") == "failed":
+        return
+    
+    metadata = data["metadata"]
+    definition = entry.get("definition")
+    example = entry.get("example_sentence")
+    
+    if definition and isinstance(definition, str) and len(definition) > metadata.get("longest_definition_length", 0):
+        metadata["longest_definition"] = word
+        metadata["longest_definition_length"] = len(definition)
+        
+    if example and isinstance(example, str) and len(example) > metadata.get("longest_example_sentence_length", 0):
+        metadata["longest_example_sentence"] = word
+        metadata["longest_example_sentence_length"] = len(example)
+
+def recalculate_longest(data):
+    """
+    Recalculate the longest definition/example sentence metadata from scratch.
+    
+    This scans every word, so it is only used for one-off migrations of files
+    written before the lengths were tracked.
+    
+    Args:
+        data (dict): The data structure holding the metadata
+    """
+    data["metadata"]["longest_definition"] = None
+    data["metadata"]["longest_definition_length"] = 0
+    data["metadata"]["longest_example_sentence"] = None
+    data["metadata"]["longest_example_sentence_length"] = 0
+    
+    for word, entry in data["words"].items():
+        update_longest(data, word, entry)
+
+def store_word_entry(data, word, entry):
+    """
+    Store a word entry and keep the longest-field metadata exact.
+    
+    A new entry only needs a constant-time comparison. Replacing the entry
+    that currently holds a longest value can shrink that maximum, so that
+    case falls back to a full recalculation.
+    
+    Args:
+        data (dict): The data structure holding the words and metadata
+        word (str): The word the entry belongs to
+        entry (dict): The word entry to store
+    """
+    metadata = data["metadata"]
+    replaces_longest = word in data["words"] and word in (
+        metadata.get("longest_definition"),
+        metadata.get("longest_example_sentence")
+    )
+    
+    data["words"][word] = entry
+    if replaces_longest:
+        recalculate_longest(data)
+    else:
+        update_longest(data, word, entry)
+
 def save_data_incrementally(data, json_file_path):
-    """Save data to JSON file incrementally."""
+    """
+    Save data to the JSON file, updating the summary metadata.
+    
+    Args:
+        data (dict): The data structure to save
+        json_file_path (str): Path to the output JSON file
+    
+    Returns:
+        bool: True if the file was written successfully
+    """
     try:
         # Update metadata
         data["metadata"]["last_updated"] = datetime.now().isoformat()
         data["metadata"]["total_words"] = len(data["words"])
         
-        # Calculate longest definition and example sentence
-        longest_def_word = None
-        longest_def_len = 0
-        longest_ex_word = None
-        longest_ex_len = 0
-        
-        for word, entry in data["words"].items():
-            # Skip entries with failed processing
-            if entry.get("processing_status") == "failed":
-                continue
-                
-            definition = entry.get("definition")
-            example = entry.get("example_sentence")
-            
-            if definition and isinstance(definition, str) and len(definition) > longest_def_len:
-                longest_def_word = word
-                longest_def_len = len(definition)
-                
-            if example and isinstance(example, str) and len(example) > longest_ex_len:
-                longest_ex_word = word
-                longest_ex_len = len(example)
-                
-        # Update metadata with the words that have the longest definition and example
-        data["metadata"]["longest_definition"] = longest_def_word
-        data["metadata"]["longest_example_sentence"] = longest_ex_word
-        
-        # Add debug logging for the longest values
-        if longest_def_word:
-            logging.debug(f"Longest definition: '{longest_def_word}' ({longest_def_len} characters)")
-        if longest_ex_word:
-            logging.debug(f"Longest example sentence: '{longest_ex_word}' ({longest_ex_len} characters)")
+        # Log the running longest values maintained by update_longest
+        metadata = data["metadata"]
+        if metadata.get("longest_definition"):
+            logging.debug(f"Longest definition: '{metadata['longest_definition']}' ({metadata.get('longest_definition_length', 0)} characters)")
+        if metadata.get("longest_example_sentence"):
+            logging.debug(f"Longest example sentence: '{metadata['longest_example_sentence']}' ({metadata.get('longest_example_sentence_length', 0)} characters)")
         
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Write to a temporary file and swap it in atomically, so a crash
+        # mid-write never leaves a truncated JSON file behind
+        temp_path = get_temp_path(json_file_path)
+        Path(temp_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        os.replace(temp_path, json_file_path)
         logging.info(f"Data saved to {json_file_path}")
+        return True
     except Exception as e:
         logging.error(f"Error saving data to {json_file_path}: {e}")
+        return False
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value into a number of seconds.
+    
+    Args:
+        value (str): Header value, either delay-seconds or an HTTP-date
+        
+    Returns:
+        float: Seconds to wait, or None if the value is missing or unparseable
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    try:
+        return float(max(int(value), 0))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
 
-def exponential_backoff_request(client, prompt, max_retries=5):
+async def exponential_backoff_request(session, messages, max_retries=5):
     """
     Make API request with exponential backoff retry logic.
     
     Args:
-        client: Perplexity AI client
-        prompt: The prompt to send
+        session: aiohttp client session authorized for the Perplexity API
+        messages: The chat messages to send
         max_retries: Maximum number of retry attempts
         
     Returns:
@@ -228,27 +484,40 @@ def exponential_backoff_request(client, prompt, max_retries=5):
     """
     base_delay = 1  # Start with 1 second
     max_delay = 300  # Cap at 5 minutes
+    payload = {
+        "model": PERPLEXITY_MODEL,
+        "messages": messages
+    }
     
     for attempt in range(max_retries + 1):
         try:
             logging.info(f"API request attempt {attempt + 1}/{max_retries + 1}")
-            result = client.search_sync(prompt)
+            async with session.post(PERPLEXITY_API_URL, json=payload) as response:
+                response.raise_for_status()
+                body = await response.json()
             logging.info("API request successful")
-            return result
+            return {"text": body["choices"][0]["message"]["content"]}
             
         except Exception as e:
-            error_msg = str(e).lower()
-            
             # Check if it's a rate limit error
-            if any(indicator in error_msg for indicator in ['rate limit', 'too many requests', '429', 'quota']):
+            if RATE_LIMIT_PATTERN.search(str(e)):
                 if attempt < max_retries:
-                    # Calculate exponential backoff delay with jitter
+                    # Calculate exponential backoff delay
                     delay = min(base_delay * (2 ** attempt), max_delay)
-                    jitter = random.uniform(0.1, 0.3) * delay  # Add 10-30% jitter
-                    total_delay = delay + jitter
                     
-                    logging.warning(f"Rate limit hit. Waiting {total_delay:.1f} seconds before retry {attempt + 2}")
-                    time.sleep(total_delay)
+                    # Prefer the server's Retry-After hint when the error carries one
+                    headers = getattr(e, "headers", None) or {}
+                    retry_after = parse_retry_after(headers.get("Retry-After"))
+                    if retry_after is not None:
+                        total_delay = max(retry_after, delay)
+                        source = f"server Retry-After {retry_after:.1f}s"
+                    else:
+                        jitter = random.uniform(0.1, 0.3) * delay  # Add 10-30% jitter
+                        total_delay = delay + jitter
+                        source = "exponential backoff"
+                    
+                    logging.warning(f"Rate limit hit. Waiting {total_delay:.1f} seconds before retry {attempt + 2} ({source})")
+                    await asyncio.sleep(total_delay)
                     continue
                 else:
                     logging.error(f"Rate limit exceeded after {max_retries + 1} attempts")
@@ -260,8 +529,300 @@ def exponential_backoff_request(client, prompt, max_retries=5):
     
     return None
 
-def process_word_list(word_list_file, json_file_path, client):
-    """Process all words from the word list file with exponential backoff."""
+def parse_json_response(raw_response):
+    """
+    Parse a JSON object from an API response, tolerating common wrappers.
+    
+    Markdown code fences are stripped first; if that still does not parse,
+    the outermost {...} span in the response is tried.
+    
+    Args:
+        raw_response (str): The response text from the API
+        
+    Returns:
+        The parsed JSON value
+        
+    Raises:
+        json.JSONDecodeError: If no JSON object can be recovered
+    """
+    cleaned = raw_response.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        match = JSON_OBJECT_PATTERN.search(cleaned)
+        if match is None:
+            raise
+        return json.loads(match.group(0))
+
+async def process_one(word, session, sem):
+    """
+    Fetch and parse the data for a single word.
+    
+    Args:
+        word (str): The word to process
+        session: aiohttp client session authorized for the Perplexity API
+        sem (asyncio.Semaphore): Limits how many words are in flight at once
+        
+    Returns:
+        tuple: (word, entry) where entry is the parsed word data on success
+            or an empty entry describing the failure
+    """
+    try:
+        # Create prompt and get response with exponential backoff
+        messages = create_messages(create_prompt(word))
+        async with sem:
+            result = await exponential_backoff_request(session, messages)
+        
+        if result is None:
+            logging.error(f"Failed to get response for '{word}' after all retries")
+            return word, create_empty_word_entry(word, "API request failed after all retries")
+        
+        # Parse JSON response
+        try:
+            raw_response = result["text"]
+            response_length = len(raw_response)
+            logging.debug(f"Raw response length for '{word}': {response_length} characters")
+            
+            # Log first and last 200 characters to help debug
+            if response_length > 400:
+                logging.debug(f"Response preview for '{word}': START[{raw_response[:200]}] ... END[{raw_response[-200:]}]")
+            else:
+                logging.debug(f"Full response for '{word}': {raw_response}")
+            
+            word_data = parse_json_response(raw_response)
+            # Add processing metadata to successful entries
+            word_data["processing_status"] = "success"
+            word_data["error_reason"] = None
+            return word, word_data
+            
+        except json.JSONDecodeError as e:
+            # raw_response and response_length were set before parsing failed
+            logging.error(f"JSON parsing failed for '{word}': {e}")
+            logging.error(f"Response length: {response_length} characters")
+            logging.error(f"Response type: {type(raw_response)}")
+            
+            # Show different amounts of response based on length
+            if response_length == 0:
+                logging.error(f"Response is completely empty for '{word}'")
+            elif response_length < 100:
+                logging.error(f"Full response for '{word}': '{raw_response}'")
+            elif response_length < 500:
+                logging.error(f"Full response for '{word}': {raw_response}")
+            else:
+                logging.error(f"Response preview for '{word}' (first 300 chars): {raw_response[:300]}")
+                logging.error(f"Response preview for '{word}' (last 300 chars): {raw_response[-300:]}")
+            
+            # Determine error reason based on response content
+            stripped_response = raw_response.strip()
+            error_reason = "JSON parsing failed"
+            if REFUSAL_PATTERN.match(stripped_response):
+                error_reason = "API refused to process word"
+                logging.error(f"API refused to process '{word}' - response appears to be a refusal message")
+            elif ERROR_PATTERN.search(stripped_response):
+                error_reason = "API returned error message"
+                logging.error(f"API returned an error for '{word}' - response contains error message")
+            elif not stripped_response:
+                error_reason = "API returned empty response"
+                logging.error(f"API returned empty response for '{word}'")
+            else:
+                error_reason = "API returned non-JSON response"
+                logging.error(f"API returned non-JSON response for '{word}' - response format unexpected")
+            
+            # Record failed word with empty values
+            return word, create_empty_word_entry(word, error_reason)
+            
+    except Exception as e:
+        logging.error(f"Error processing word '{word}': {e}")
+        # Record failed word with empty values
+        return word, create_empty_word_entry(word, f"Unexpected error: {str(e)}")
+
+async def process_batch(batch, session, sem):
+    """
+    Fetch and parse the data for several words with a single API request.
+    
+    Words missing from the batched response, or every word if the response
+    cannot be parsed, are retried once as individual requests. If the
+    request itself fails, every word is recorded as failed without retrying.
+    
+    Args:
+        batch (list[str]): The words to process
+        session: aiohttp client session authorized for the Perplexity API
+        sem (asyncio.Semaphore): Limits how many requests are in flight at once
+        
+    Returns:
+        list: (word, entry) tuples for every word in the batch
+    """
+    if len(batch) == 1:
+        return [await process_one(batch[0], session, sem)]
+    
+    try:
+        messages = create_messages(create_batch_prompt(batch))
+        async with sem:
+            result = await exponential_backoff_request(session, messages)
+    except Exception as e:
+        # exponential_backoff_request has already retried what can be retried
+        logging.error(f"Batched request failed for {len(batch)} words: {e}")
+        return [(word, create_empty_word_entry(word, f"Unexpected error: {str(e)}")) for word in batch]
+    
+    if result is None:
+        logging.error(f"Failed to get batched response for {len(batch)} words after all retries")
+        return [(word, create_empty_word_entry(word, "API request failed after all retries")) for word in batch]
+    
+    entries = []
+    try:
+        results = parse_json_response(result["text"])["results"]
+        
+        for word in batch:
+            word_data = results.get(word)
+            if not isinstance(word_data, dict):
+                continue
+            # Add processing metadata to successful entries
+            word_data["processing_status"] = "success"
+            word_data["error_reason"] = None
+            entries.append((word, word_data))
+            
+    except Exception as e:
+        logging.error(f"Could not parse batched response for {len(batch)} words: {e}")
+    
+    # Retry anything the batched response did not cover, one word at a time
+    answered = {word for word, _ in entries}
+    missing = [word for word in batch if word not in answered]
+    if missing:
+        logging.warning(f"Retrying {len(missing)}/{len(batch)} words individually: {missing}")
+        entries.extend(await asyncio.gather(*(process_one(word, session, sem) for word in missing)))
+    
+    return entries
+
+def chunked(words, size):
+    """Yield successive lists of at most `size` words."""
+    iterator = iter(words)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def read_word_list(word_file):
+    """
+    Yield each non-empty, lowercased line from the open word list file.
+    
+    A read or decoding error part way through the file is logged and ends
+    the stream, so words already queued are still processed and saved.
+    """
+    try:
+        for line in word_file:
+            word = line.strip().lower()
+            if word:
+                yield word
+    except (OSError, UnicodeDecodeError) as e:
+        logging.error(f"Error loading word list from {word_file.name}: {e}")
+        logging.error("Stopped reading the word list - words queued before the error will still be processed")
+
+def iter_pending_words(word_file, existing_words, complete_words, reprocessing_words, stats):
+    """
+    Yield each word from the open word list file that still needs an API call.
+    
+    Words are lowercased and yielded at most once, in file order. Invalid
+    entries are logged and dropped, words with complete data are counted as
+    skipped, and words with an incomplete entry are added to
+    reprocessing_words.
+    
+    Args:
+        word_file: Open word list file, one word per line
+        existing_words (dict): Word entries loaded from previous runs
+        complete_words (set): Words whose entries already have complete data
+        reprocessing_words (set): Collects words that will be reprocessed
+        stats (dict): Counters updated in place
+    """
+    seen = set()
+    for word in read_word_list(word_file):
+        # Drop repeated words (including case variants), keeping first occurrences
+        if word in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(word)
+        
+        # Numbers, punctuation and other noise would only waste a request
+        if not is_valid_word(word):
+            logging.warning(f"Ignoring invalid word list entry: {word!r}")
+            stats["invalid"] += 1
+            continue
+        stats["loaded"] += 1
+        
+        if word in complete_words:
+            stats["skipped"] += 1
+            continue
+        
+        stats["queued"] += 1
+        # Existing entries that are not complete get reprocessed
+        if word in existing_words:
+            logging.info(f"[{stats['queued']}] Reprocessing '{word}' - missing/incomplete data")
+            reprocessing_words.add(word)
+        else:
+            logging.info(f"[{stats['queued']}] Queued new word: '{word}'")
+        yield word
+
+async def produce_batches(pending_words, queue, batch_size, worker_count):
+    """
+    Stream batches of pending words into the queue.
+    
+    A None sentinel is queued for each worker once the words run out.
+    
+    Args:
+        pending_words: Iterator of words needing an API call
+        queue (asyncio.Queue): Bounded queue feeding the workers
+        batch_size (int): Maximum number of words per batch
+        worker_count (int): Number of workers consuming the queue
+    """
+    for batch in chunked(pending_words, batch_size):
+        await queue.put(batch)
+    
+    for _ in range(worker_count):
+        await queue.put(None)
+
+def record_results(data, journal, results, reprocessing_words, stats):
+    """
+    Merge a finished batch into data and append it to the journal.
+    
+    Args:
+        data (dict): The data structure being built
+        journal: Journal file open in binary append mode
+        results (list): (word, entry) tuples returned by process_batch
+        reprocessing_words (set): Words that already had an incomplete entry
+        stats (dict): Counters updated in place
+    """
+    # One timestamp for every word that arrived together
+    now_iso = datetime.now().isoformat()
+    
+    for word, entry in results:
+        entry["processed_date"] = now_iso
+        # Record completeness once so later runs can skip the field check
+        entry["_complete"] = has_required_fields(entry)
+        store_word_entry(data, word, entry)
+        
+        # Journal each word as it arrives so an interruption loses nothing
+        append_to_journal(journal, word, entry)
+        
+        if entry["processing_status"] != "success":
+            stats["errors"] += 1
+        elif word in reprocessing_words:
+            stats["reprocessed"] += 1
+            logging.info(f"Successfully reprocessed '{word}' ({stats['reprocessed']} reprocessed)")
+        else:
+            stats["processed"] += 1
+            logging.info(f"Successfully processed '{word}' ({stats['processed']} completed)")
+
+async def process_batches(queue, session, sem, data, journal, reprocessing_words, stats):
+    """Take batches from the queue and record their results until a None sentinel arrives."""
+    while (batch := await queue.get()) is not None:
+        results = await process_batch(batch, session, sem)
+        record_results(data, journal, results, reprocessing_words, stats)
+
+async def process_word_list(word_list_file, json_file_path, session, concurrency, batch_size):
+    """Process all words from the word list file concurrently with exponential backoff."""
+    
+    # Discard a staged save left behind by a crash; the JSON file and journal are intact
+    temp_path = get_temp_path(json_file_path)
+    if os.path.exists(temp_path):
+        logging.warning(f"Removing leftover temporary file {temp_path}")
+        os.remove(temp_path)
     
     # Load existing data or create new structure
     data = load_existing_data(json_file_path)
@@ -269,136 +830,103 @@ def process_word_list(word_list_file, json_file_path, client):
         data = create_metadata()
         logging.info("Created new data structure")
     
-    # Load word list
+    # Pick up any words journaled by a previous run that never finished
+    journal_path = get_journal_path(json_file_path)
+    load_journal(data, journal_path)
+    
+    # Open word list; it is streamed rather than read up front
     try:
-        with open(word_list_file, 'r', encoding='utf-8') as f:
-            words = [line.strip() for line in f if line.strip()]
-        logging.info(f"Loaded {len(words)} words from {word_list_file}")
+        word_file = open(word_list_file, 'r', encoding='utf-8')
     except Exception as e:
         logging.error(f"Error loading word list from {word_list_file}: {e}")
         return
     
-    # Process each word
-    processed_count = 0
-    skipped_count = 0
-    reprocessed_count = 0
-    error_count = 0
+    # Check each stored entry only once
+    complete_words = {word for word, entry in data["words"].items() if has_complete_data(entry)}
+    reprocessing_words = set()
+    stats = {
+        "loaded": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "skipped": 0,
+        "queued": 0,
+        "processed": 0,
+        "reprocessed": 0,
+        "errors": 0
+    }
     
-    for i, word in enumerate(words, 1):
-        # Check if word already exists in JSON
-        if word in data["words"]:
-            existing_entry = data["words"][word]
-            
-            # Check if existing entry has complete data
-            if has_complete_data(existing_entry):
-                logging.info(f"[{i}/{len(words)}] Skipping '{word}' - already complete")
-                skipped_count += 1
-                continue
-            else:
-                logging.info(f"[{i}/{len(words)}] Reprocessing '{word}' - missing/incomplete data")
-                # Will continue to process this word
-                is_reprocessing = True
-        else:
-            logging.info(f"[{i}/{len(words)}] Processing new word: '{word}'")
-            is_reprocessing = False
-        
-        try:
-            # Create prompt and get response with exponential backoff
-            prompt = create_prompt(word)
-            result = exponential_backoff_request(client, prompt)
-            
-            if result is None:
-                logging.error(f"Failed to get response for '{word}' after all retries")
-                # Record failed word with empty values
-                empty_entry = create_empty_word_entry(word, "API request failed after all retries")
-                data["words"][word] = empty_entry
-                save_data_incrementally(data, json_file_path)
-                error_count += 1
-                continue
-            
-            # Parse JSON response
+    # One producer streams batches into a bounded queue; `concurrency` workers
+    # send them to the API, so the first request goes out before the file is read
+    sem = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue(maxsize=2 * concurrency)
+    
+    try:
+        with word_file, open(journal_path, 'ab') as journal:
+            pending_words = iter_pending_words(word_file, data["words"], complete_words, reprocessing_words, stats)
+            producer = produce_batches(pending_words, queue, batch_size, concurrency)
+            workers = [
+                process_batches(queue, session, sem, data, journal, reprocessing_words, stats)
+                for _ in range(concurrency)
+            ]
+            tasks = [asyncio.create_task(coroutine) for coroutine in (producer, *workers)]
             try:
-                raw_response = result["text"]
-                logging.debug(f"Raw response length for '{word}': {len(raw_response)} characters")
-                
-                # Log first and last 200 characters to help debug
-                if len(raw_response) > 400:
-                    logging.debug(f"Response preview for '{word}': START[{raw_response[:200]}] ... END[{raw_response[-200:]}]")
-                else:
-                    logging.debug(f"Full response for '{word}': {raw_response}")
-                
-                word_data = json.loads(raw_response)
-                # Add processing metadata to successful entries
-                word_data["processing_status"] = "success"
-                word_data["processed_date"] = datetime.now().isoformat()
-                word_data["error_reason"] = None
-                
-                data["words"][word] = word_data
-                
-                if is_reprocessing:
-                    reprocessed_count += 1
-                    logging.info(f"Successfully reprocessed '{word}' ({reprocessed_count} reprocessed)")
-                else:
-                    processed_count += 1
-                    logging.info(f"Successfully processed '{word}' ({processed_count} completed)")
-                
-                # Save data incrementally after each word
-                save_data_incrementally(data, json_file_path)
-                
-                # Small delay between successful requests to be respectful
-                time.sleep(1)
-                
-            except json.JSONDecodeError as e:
-                raw_response = result["text"]
-                logging.error(f"JSON parsing failed for '{word}': {e}")
-                logging.error(f"Response length: {len(raw_response)} characters")
-                logging.error(f"Response type: {type(raw_response)}")
-                
-                # Show different amounts of response based on length
-                if len(raw_response) == 0:
-                    logging.error(f"Response is completely empty for '{word}'")
-                elif len(raw_response) < 100:
-                    logging.error(f"Full response for '{word}': '{raw_response}'")
-                elif len(raw_response) < 500:
-                    logging.error(f"Full response for '{word}': {raw_response}")
-                else:
-                    logging.error(f"Response preview for '{word}' (first 300 chars): {raw_response[:300]}")
-                    logging.error(f"Response preview for '{word}' (last 300 chars): {raw_response[-300:]}")
-                
-                # Determine error reason based on response content
-                error_reason = "JSON parsing failed"
-                if raw_response.strip().startswith("I'm sorry") or raw_response.strip().startswith("I cannot"):
-                    error_reason = "API refused to process word"
-                    logging.error(f"API refused to process '{word}' - response appears to be a refusal message")
-                elif raw_response.strip().startswith("Error") or "error" in raw_response.lower():
-                    error_reason = "API returned error message"
-                    logging.error(f"API returned an error for '{word}' - response contains error message")
-                elif not raw_response.strip():
-                    error_reason = "API returned empty response"
-                    logging.error(f"API returned empty response for '{word}'")
-                else:
-                    error_reason = "API returned non-JSON response"
-                    logging.error(f"API returned non-JSON response for '{word}' - response format unexpected")
-                
-                # Record failed word with empty values
-                empty_entry = create_empty_word_entry(word, error_reason)
-                data["words"][word] = empty_entry
-                save_data_incrementally(data, json_file_path)
-                error_count += 1
-                continue
-                
-        except Exception as e:
-            logging.error(f"Error processing word '{word}': {e}")
-            # Record failed word with empty values
-            empty_entry = create_empty_word_entry(word, f"Unexpected error: {str(e)}")
-            data["words"][word] = empty_entry
-            save_data_incrementally(data, json_file_path)
-            error_count += 1
-            continue
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the remaining tasks before the journal they write to is closed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+    finally:
+        # Write the consolidated JSON once, including after an interruption;
+        # the journal is only needed until that write succeeds
+        if save_data_incrementally(data, json_file_path) and os.path.exists(journal_path):
+            os.remove(journal_path)
     
-    logging.info(f"Processing complete. New: {processed_count}, Reprocessed: {reprocessed_count}, Skipped: {skipped_count}, Errors: {error_count}")
+    logging.info(f"Loaded {stats['loaded']} words from {word_list_file}")
+    if stats["duplicates"]:
+        logging.info(f"Deduplicated {stats['duplicates']} entries")
+    if stats["invalid"]:
+        logging.info(f"Ignored {stats['invalid']} invalid entries")
+    logging.info(f"Processing complete. New: {stats['processed']}, Reprocessed: {stats['reprocessed']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
     return data
 
+def create_connection_trace(connection_stats):
+    """
+    Create an aiohttp trace config that counts new and reused pooled connections.
+    
+    Args:
+        connection_stats (dict): Counters updated in place under "created" and "reused"
+        
+    Returns:
+        aiohttp.TraceConfig: Trace config to pass to the client session
+    """
+    async def on_connection_create_end(session, trace_config_ctx, params):
+        connection_stats["created"] += 1
+    
+    async def on_connection_reuseconn(session, trace_config_ctx, params):
+        connection_stats["reused"] += 1
+    
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+async def run(word_list_file, json_file_path, api_key, concurrency, batch_size):
+    """Open a shared HTTP session and process the word list with it."""
+    # Pool one keep-alive connection per concurrent request so the TLS
+    # handshake is paid once per connection rather than once per word
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, keepalive_timeout=60)
+    headers = {"Authorization": f"Bearer {api_key}"}
+    connection_stats = {"created": 0, "reused": 0}
+    trace_configs = [create_connection_trace(connection_stats)]
+    
+    async with aiohttp.ClientSession(connector=connector, headers=headers, trace_configs=trace_configs) as session:
+        try:
+            return await process_word_list(word_list_file, json_file_path, session, concurrency, batch_size)
+        finally:
+            logging.debug(f"HTTP connections opened: {connection_stats['created']}, reused: {connection_stats['reused']}")
+
 def update_existing_json(json_file_path):
     """
     Update an existing JSON file to include the new metadata fields.
@@ -410,12 +938,13 @@ def update_existing_json(json_file_path):
     
     try:
         # Load the existing JSON
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = orjson.loads(Path(json_file_path).read_bytes())
         
         logging.info(f"Loaded existing JSON file for update: {json_file_path}")
         
-        # Calculate and update the longest fields
+        # Calculate and update the longest fields and completeness flags
+        recalculate_longest(data)
+        backfill_complete_flags(data)
         save_data_incrementally(data, json_file_path)
         
         logging.info(f"Successfully updated metadata in {json_file_path}")
@@ -424,6 +953,16 @@ def update_existing_json(json_file_path):
         logging.error(f"Error updating existing JSON file: {e}")
         return False
 
+def positive_int(value):
+    """Parse a command line value as an integer of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(
         description="Process word list using Perplexity AI with intelligent exponential backoff rate limiting",
@@ -431,7 +970,9 @@ def main():
         epilog="""
 Features:
   • Intelligent exponential backoff handles rate limits automatically
-  • Incremental JSON saves prevent data loss on failures  
+  • Concurrent API requests over a single shared HTTP session
+  • Batches several words into each API request
+  • Per-word journal (<output>.jsonl) prevents data loss on failures  
   • Skip processing for words already in output file
   • Comprehensive logging to console and lexophile.log
   • Metadata tracking (word count, timestamps, source info)
@@ -442,10 +983,14 @@ Examples:
   python lexophile.py --debug                   # Enable debug logging for troubleshooting
   python lexophile.py --word-list custom.txt    # Use custom word list
   python lexophile.py --output my_words.json    # Custom output file
+  python lexophile.py --concurrency 10          # Keep up to 10 requests in flight
+  python lexophile.py --batch-size 1            # One word per API request
+  python lexophile.py --migrate-metadata        # Recalculate metadata in the output file and exit
   python lexophile.py --word-list words.txt --output data.json --debug  # All options
 
 Rate Limiting:
   The script automatically handles API rate limits using exponential backoff:
+  • Honors the server's Retry-After header when present (never waiting less than the backoff step)
   • 1s → 2s → 4s → 8s → 16s delays (max 5 minutes)
   • Adds 10-30% jitter to prevent thundering herd effects
   • Retries up to 5 times for rate limit errors
@@ -465,12 +1010,32 @@ Rate Limiting:
         help='Output JSON file path (default: lexophile.json)'
     )
     
+    parser.add_argument(
+        '--concurrency',
+        type=positive_int,
+        default=5,
+        help='Maximum number of API requests in flight (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=positive_int,
+        default=10,
+        help='Number of words requested per API call (default: 10)'
+    )
+    
     parser.add_argument(
         '--debug',
         action='store_true',
         help='Enable debug logging to see API response details'
     )
     
+    parser.add_argument(
+        '--migrate-metadata',
+        action='store_true',
+        help='Recalculate metadata fields in an existing output file and exit'
+    )
+    
     args = parser.parse_args()
     
     # Load environment variables
@@ -481,9 +1046,17 @@ Rate Limiting:
     logging.info("Starting Perplexity AI word processor with exponential backoff")
     logging.info(f"Word list: {args.word_list}")
     logging.info(f"Output file: {args.output}")
+    logging.info(f"Concurrency: {args.concurrency}")
+    logging.info(f"Batch size: {args.batch_size}")
     if args.debug:
         logging.info("Debug logging enabled - API responses will be logged")
     
+    # One-off metadata upgrade of an existing JSON file; no API calls needed
+    if args.migrate_metadata:
+        logging.info("Ensuring metadata fields are up-to-date...")
+        update_existing_json(args.output)
+        return
+    
     # Get API key from environment
     api_key = os.getenv("PERPLEXITY_API_KEY")
     if not api_key:
@@ -492,18 +1065,11 @@ Rate Limiting:
         logging.error("Example: PERPLEXITY_API_KEY=pplx-your-api-key-here")
         return
     
-    # Check if we should update an existing JSON file's metadata
-    if os.path.exists(args.output):
-        logging.info(f"Found existing JSON file: {args.output}")
-        logging.info("Ensuring metadata fields are up-to-date...")
-        update_existing_json(args.output)
-    
-    # Initialize Perplexity client
+    # Process words over a single shared HTTP session
     try:
-        with PerplexityClient(api_key) as client:
-            process_word_list(args.word_list, args.output, client)
+        asyncio.run(run(args.word_list, args.output, api_key, args.concurrency, args.batch_size))
     except Exception as e:
-        logging.error(f"Error initializing Perplexity client: {e}")
+        logging.error(f"Error running Perplexity word processor: {e}")
         if "authentication" in str(e).lower() or "unauthorized" in str(e).lower():
             logging.error("This may be due to an invalid API key. Please check your PERPLEXITY_API_KEY in the .env file")
 